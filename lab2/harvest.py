@@ -3,6 +3,7 @@
 #%% packages used by this file
 import numpy as np
 import scipy.stats as stats
+from scipy.special import gammaln, logsumexp, xlogy
 import matplotlib.pyplot as plt
 
 #%% Harvest funktionen
@@ -41,22 +42,71 @@ def harvest(n, p, mu, y_cond=None):
     
     Johan Lindström
     """
+    x, y, pXY, pY, pX_Y = harvest_compute(n, p, mu, y_cond)
+    ##return
+    return harvest_plot(x, y, pXY, pY, pX_Y, y_cond)
+
+#%% beräkningsdelen av harvest
+def harvest_compute(n, p, mu, y_cond=None):
+    """
+    Compute densities for binomial sum of Poisson
+    
+    Computes the joint density for the number of harvested seeds (Y) and the
+    number of original seeds that grew (X); the marginal density for Y; and,
+    if y_cond is given, the conditional density for X|Y=y_cond. See harvest
+    for the model. No plotting is done, making the function suitable for
+    parameter sweeps.
+
+    Parameters
+    ----------
+    n : Positive integer
+        Number of seeds to consider
+    p : Number in 0 to 1
+        Probability of growth
+    mu : Positive number
+         Mean value of yield for each seed that grows.
+    y_cond : Positive number, optional
+        Observed yield. If given, also compute conditional distribution for 
+        the number of seeds that grew, given yield.
+        The default is None.
+
+    Returns
+    -------
+    x : Values 0,...,n for X
+    y : Values 0,...,Ymax for Y
+    pXY : Joint probabilities, array of size (Ymax+1, n+1)
+    pY : Marginal probabilities for Y
+    pX_Y : Conditional probabilities for X|Y=y_cond, None if y_cond is None
+    """
     # Determin Ymax, based on E(Y) and V(Y)
     tot_E = n*p*mu
     tot_V = tot_E*(1+mu*(1-p))
-    Ymax = tot_E+4*np.sqrt(tot_V)
+    Ymax = int(np.ceil(tot_E+4*np.sqrt(tot_V)))
     # ensure that Ymax is as large as y_cond
     if not (y_cond is None):
-        Ymax = max([Ymax,y_cond])
+        Ymax = max([Ymax,int(np.ceil(y_cond))])
     
-    #create vectors for x and y
+    #create (integer) vectors for x and y
     x = np.arange(n+1)
-    y = np.arange(Ymax+1)
-    # expand vector to grid
-    X_in,Y_in = np.meshgrid(x, y)
+    y = np.arange(Ymax+1, dtype=np.int64)
+    # row and column versions, broadcasting gives the grid (cf. np.ogrid)
+    X_in = x[np.newaxis, :]
+    Y_in = y[:, np.newaxis]
     
     # Compute joint probabilities using Law of Total Prob.
-    pXY = stats.binom.pmf(X_in,n,p) * stats.poisson.pmf(Y_in,X_in*mu)
+    # p_X(k) does not depend on l, compute it once and broadcast over y
+    # (log-scale is reused for the conditional, -Inf for impossible k)
+    log_pX = stats.binom.logpmf(x,n,p)
+    pX = np.exp(log_pX)
+    # p_Y|X(l|k) = (k*mu)^l exp(-k*mu) / l!, computed on log-scale;
+    # gammaln only needs the y column, and lambda=0 gives mass 1 at l=0
+    lam = X_in*mu
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_pY_X = np.where(lam > 0,
+                            Y_in*np.log(lam) - lam - gammaln(Y_in+1),
+                            np.where(Y_in == 0, 0.0, -np.inf))
+    pY_X = np.exp(log_pY_X)
+    pXY = pX[np.newaxis, :] * pY_X
     # Compute marginal probability
     pY = pXY.sum(axis=1)
     
@@ -67,27 +117,51 @@ def harvest(n, p, mu, y_cond=None):
       #what should be computed
       # pX_Y = stats.binom.pmf(x,n,p)*stats.poisson.pmf(y_cond,x*mu)
       #However, we use a numerically stable log approach
-      pX_Y = np.log(stats.binom.pmf(x,n,p)) - x*mu
-      #we also need to add (x*mu)^y (but not for x[0]=0)
-      pX_Y[1:] = pX_Y[1:] + y_cond*np.log(x[1:]*mu)
-      #first point should instead be log(0)=-Inf (0 when we transform back)
-      pX_Y[0] = -np.Inf
-      #convert to standard scale
-      pX_Y = np.exp(pX_Y-max(pX_Y))
-      #and normalize
-      pX_Y = pX_Y / sum(pX_Y)
+      #(xlogy gives -Inf for x=0 and y_cond>0, 0 for y_cond=0, and also
+      #works for non-integer y_cond; the y_cond! term cancels)
+      pX_Y = log_pX + xlogy(y_cond, x*mu) - x*mu
+      #convert to standard scale and normalize
+      pX_Y = np.exp(pX_Y - logsumexp(pX_Y))
     #if y_cond is None; else
-     
+    
+    ##return
+    return x, y, pXY, pY, pX_Y
+
+#%% plotdelen av harvest
+def harvest_plot(x, y, pXY, pY, pX_Y, y_cond=None):
+    """
+    Plot densities computed by harvest_compute
+
+    Parameters
+    ----------
+    x, y, pXY, pY, pX_Y : Output from harvest_compute
+    y_cond : Positive number, optional
+        Observed yield, must match the one used in harvest_compute.
+        The default is None.
+
+    Returns
+    -------
+    Figure object of matplotlib.figure containing plots of the densities.
+    """
+    #number of seeds, x = 0,...,n
+    n = x[-1]
+    
     fig = plt.figure()
-    ax = [[fig.add_subplot(2, 2, 1, projection='3d'),
-           fig.add_subplot(2, 2, 2)],
-          [fig.add_subplot(2, 2, 3),None]]
+    #array of axes, ax[1,1] is only added if y_cond is given
+    ax = np.empty((2,2), dtype=object)
+    ax[0,0] = fig.add_subplot(2, 2, 1, projection='3d')
+    ax[0,1] = fig.add_subplot(2, 2, 2)
+    ax[1,0] = fig.add_subplot(2, 2, 3)
     
     #justera plottar så att texten inte överlappar
     fig.subplots_adjust(hspace=0.55, wspace=0.35)
     
-    ax = np.array(ax)
-    ax[0,0].stem(X_in.flatten(), Y_in.flatten(), pXY.flatten(), 
+    #only draw stems for cells with non-negligible probability
+    #(the full grid is still shown by pcolormesh in ax[0,1])
+    mask = pXY > 1e-6*pXY.max()
+    ax[0,0].stem(np.broadcast_to(x[np.newaxis, :], pXY.shape)[mask],
+                 np.broadcast_to(y[:, np.newaxis], pXY.shape)[mask],
+                 pXY[mask],
                  basefmt=' ', markerfmt=' ')
     ax[0,0].set_xlabel('k')
     ax[0,0].set_ylabel('l')
@@ -6,7 +6,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 
 #%% funktionen skattningar
-def skattningar(mu=0, sigma=1, n=(10,100), alternativ='muskatt'):
+def skattningar(mu=0, sigma=1, n=(10,100), alternativ='muskatt', rng=None):
 	"""
 	skattningar Illustrerar mu och sigma^2-skattning samt konfidensintervall
 	
@@ -30,6 +30,10 @@ def skattningar(mu=0, sigma=1, n=(10,100), alternativ='muskatt'):
 		'sigmaskatt': Histogram for skattningar av sigma^2
 		'konfint': Illustrerar konfidensintervall for mu.
 		The default is 'muskatt'.
+	rng : heltal eller numpy.random.Generator, optional
+		Frö (seed) eller slumptalsgenerator för simuleringen. Ange ett 
+		värde för att få samma figur vid varje anrop. Om det inte anges 
+		används en ny, oseedad generator. The default is None.
 
 	Returns
 	-------
@@ -42,19 +46,26 @@ def skattningar(mu=0, sigma=1, n=(10,100), alternativ='muskatt'):
 	#Antal simuleringar som gors
 	n_sim = 1000
 	#simulera tva sample
-	x = stats.norm.rvs(mu, sigma, n[0]*n_sim).reshape((n_sim,n[0]))
-	y = stats.norm.rvs(mu, sigma, n[1]*n_sim).reshape((n_sim,n[1]))
+	#(ett anrop till slumptalsgeneratorn, delas upp i de två sampeln)
+	#sampeln hålls standardiserade, N(0,1); mu och sigma appliceras på
+	#skattningarna istället, mean(sigma*z+mu) = sigma*mean(z)+mu och
+	#var(sigma*z+mu) = sigma^2*var(z)
+	rng = np.random.default_rng(rng)
+	N0, N1 = int(n[0]), int(n[1])
+	data = rng.standard_normal((n_sim,N0+N1))
+	z_x = data[:,:N0]
+	z_y = data[:,N0:]
 	
 	#%% illustrerar skattningar av mu med olika n
 	if alternativ=='muskatt':
 		#mu estimates
-		mu_est = np.column_stack( (x.mean(axis=1), y.mean(axis=1)) )
+		mu_est = [z_x.mean(axis=1)*sigma + mu, z_y.mean(axis=1)*sigma + mu]
 		#intervallens bredd, for att satta axlar.
 		width = 3*sigma / np.sqrt(min(n))
 		#subplots and the
 		fig,axs = plt.subplots(2, 1, constrained_layout=True)
 		for i in [0,1]:
-			sns.histplot(x=mu_est[:,i], ax=axs[i], stat='density')
+			sns.histplot(x=mu_est[i], ax=axs[i], stat='density')
 			axs[i].set_title('Skattning av mu, n = ' + format(n[i],'d') + 
 					' observationer')
 			axs[i].axvline(x=mu, color='r')
@@ -64,13 +75,13 @@ def skattningar(mu=0, sigma=1, n=(10,100), alternativ='muskatt'):
 	#%% illustrerar skattningar av s2 med olika n
 	elif alternativ=='sigmaskatt':
 		#sigma estimates
-		s2_est = np.column_stack( (np.var(x,axis=1), np.var(y,axis=1)) )
+		s2_est = [np.var(z_x,axis=1)*sigma**2, np.var(z_y,axis=1)*sigma**2]
 		#intervallens bredd, for att satta axlar.
 		width = max( stats.chi2.ppf(0.9995, n-1)/(n-1) )
 		#subplots and the
 		fig,axs = plt.subplots(2, 1, constrained_layout=True)
 		for i in [0,1]:
-			sns.histplot(x=s2_est[:,i], ax=axs[i], stat='density')
+			sns.histplot(x=s2_est[i], ax=axs[i], stat='density')
 			axs[i].set_title('Skattning av s2, n = ' + format(n[i],'d') + 
 					' observationer')
 			axs[i].axvline(x=sigma**2, color='r')
@@ -82,26 +93,25 @@ def skattningar(mu=0, sigma=1, n=(10,100), alternativ='muskatt'):
 		#intervall bredd
 		w = stats.norm.ppf(0.975)*sigma/np.sqrt(n)
 		#mu estimates for the first 100 samples
-		mu_est = np.column_stack( (x.mean(axis=1), 
-							 y.mean(axis=1)) )
-		#intervalls
-		CI_x = np.column_stack( (mu_est[:,0]-w[0],mu_est[:,0]+w[0]) )
-		CI_y = np.column_stack( (mu_est[:,1]-w[1],mu_est[:,1]+w[1]) )
-		
-		#testa vilka intervall som tacker mu (genom att tecken-testa gränserna)
-		I_x = np.sign(CI_x-mu).prod(axis=1) == 1
-		I_y = np.sign(CI_y-mu).prod(axis=1) == 1
+		mu_est = [z_x.mean(axis=1)*sigma + mu, z_y.mean(axis=1)*sigma + mu]
+		#testa vilka intervall som missar mu (skattningen mer än w från mu)
+		I_x = np.abs(mu_est[0]-mu) > w[0]
+		I_y = np.abs(mu_est[1]-mu) > w[1]
 		#beräkna andel som missar
 		p = [I_x.mean(), I_y.mean()]
-		#konvertera indikatorn till färg (true='r', false='b')
-		I_x = ['r' if i else 'b' for i in I_x]
-		I_y = ['r' if i else 'b' for i in I_y]
 		
 		#antal att plotta
 		n_plot = 100
+		#intervalls, only for the ones that are plotted
+		CI_x = mu_est[0][0:n_plot,np.newaxis] + np.array([-w[0], w[0]])
+		CI_y = mu_est[1][0:n_plot,np.newaxis] + np.array([-w[1], w[1]])
+		#konvertera indikatorn till färg (true='r', false='b')
+		palette = np.array(['b', 'r'])
+		I_x = palette[I_x[0:n_plot].astype(np.int8)]
+		I_y = palette[I_y[0:n_plot].astype(np.int8)]
 		#computer intervall widths for plotting
-		width = 1.2*np.max( [np.abs(CI_x[0:n_plot,:]-mu).max(), 
-					   np.abs(CI_y[0:n_plot,:]-mu).max()] )
+		width = 1.2*np.max( [np.abs(CI_x-mu).max(), 
+					   np.abs(CI_y-mu).max()] )
 		#plot
 		fig,axs = plt.subplots(1, 2, constrained_layout=True)
 		for i in [0,1]:
@@ -110,10 +120,10 @@ def skattningar(mu=0, sigma=1, n=(10,100), alternativ='muskatt'):
 			axs[i].set_title('Intervall för mu, n = ' + format(n[i],'d'))
 			axs[i].set_xlabel('Andel av 1000 som missar: ' + 
 				  format(p[i],'.3f'))
-		axs[0].hlines(y=np.arange(n_plot), xmin=CI_x[0:n_plot,0], 
-				xmax=CI_x[0:n_plot,1], colors=I_x[0:n_plot])
-		axs[1].hlines(y=np.arange(n_plot), xmin=CI_y[0:n_plot,0], 
-				xmax=CI_y[0:n_plot,1], colors=I_y[0:n_plot])
+		axs[0].hlines(y=np.arange(n_plot), xmin=CI_x[:,0], 
+				xmax=CI_x[:,1], colors=I_x)
+		axs[1].hlines(y=np.arange(n_plot), xmin=CI_y[:,0], 
+				xmax=CI_y[:,1], colors=I_y)
 	else:
 		err = "The 'alternativ' parameters must be one of " + \
 			"'muskatt', 'sigmaskatt' or 'konfint'; not " + \
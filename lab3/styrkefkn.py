@@ -1,11 +1,48 @@
 # -*- coding: utf-8 -*-
 #%% packages used by this file
+import functools
+import math
 import numpy as np
 import scipy.stats as stats
+from scipy.special import ndtr
 import matplotlib.pyplot as plt
+#numba is optional, only used to speed up the power function
+try:
+	from numba import njit
+except ImportError:
+	njit = None
+
+#%% hjälpfunktion för styrkefunktionen
+if njit is None:
+	def _power_curve(k1, k2, x, s):
+		"""h(x) = 1 - P(k1 < X < k2) for X ~ N(x, s^2)"""
+		#ndtr is the standard normal cdf, without the scipy.stats overhead
+		return 1 - (ndtr((k2-x)/s) - ndtr((k1-x)/s))
+else:
+	@njit(cache=True)
+	def _power_curve(k1, k2, x, s):
+		"""h(x) = 1 - P(k1 < X < k2) for X ~ N(x, s^2)"""
+		#Phi(z) = erfc(-z/sqrt(2))/2, k1 and k2 may be -Inf/Inf
+		c = 1/(s*math.sqrt(2))
+		out = np.empty_like(x)
+		for i in range(x.shape[0]):
+			out[i] = 1 - 0.5*(math.erfc((x[i]-k2)*c) - math.erfc((x[i]-k1)*c))
+		return out
+#if njit is None; else
+
+@functools.lru_cache(maxsize=32)
+def _styrkefkn_curve(k1, k2, s, x_min, x_max, n_points):
+	"""Grid x and power function h(x), cached for repeated calls that only
+	change mu_sant. The returned arrays are read-only."""
+	x = np.linspace(x_min, x_max, n_points)
+	h = _power_curve(k1, k2, x, s)
+	x.flags.writeable = False
+	h.flags.writeable = False
+	return x, h
 
 #%% funktionen skattningar
-def styrkefkn(mu0, sigma, n, alpha=0.05, riktning='!=', mu_sant=None):
+def styrkefkn(mu0, sigma, n, alpha=0.05, riktning='!=', mu_sant=None,
+			  n_points=400):
 	"""
 	styrkefkn Illustrerar styrekfunktion for hypotestest
 	
@@ -28,6 +65,9 @@ def styrkefkn(mu0, sigma, n, alpha=0.05, riktning='!=', mu_sant=None):
 		Värde under H1 som styrkan räknas utför och typ I och II fel 
 		illustreras. Om det inte anges illustrerars bara styrkan. 
 		The default is None.
+	n_points : positive integer, optional
+		Antal punkter som styrkefunktionen och täthetsfunktionerna 
+		beräknas i. The default is 400.
 
 	Returns
 	-------
@@ -39,29 +79,33 @@ def styrkefkn(mu0, sigma, n, alpha=0.05, riktning='!=', mu_sant=None):
 	s = sigma/np.sqrt(n)
 
 	#Beräkna styrkefunktionen för de olika fallen
+	#(och position för textannoteringen)
 	match riktning:
 		case "<":
 			k1 = stats.norm.ppf(alpha, mu0, s)
 			k2 = np.Inf
-			x = np.linspace(k1-4*s, mu0+3*s, 1000)
+			x_lim = (k1-4*s, mu0+3*s)
+			x_text = x_lim[1]-2*s
 		case ">":
 			k1 = -np.Inf
 			k2 = stats.norm.ppf(1-alpha, mu0, s)
-			x = np.linspace(mu0-3*s, k2+4*s, 1000)
+			x_lim = (mu0-3*s, k2+4*s)
+			x_text = x_lim[0]+s
 		case "!=":
 			k1 = stats.norm.ppf(alpha/2, mu0, s)
 			k2 = stats.norm.ppf(1-alpha/2, mu0, s)
-			x = np.linspace(k1-4*s, k2+4*s, 1000)
+			x_lim = (k1-4*s, k2+4*s)
+			x_text = mu0-0.5*s
 		case _:
 			err = "The 'riktning' parameters must be one of " + \
 				"'!=', '<' or '>'; not " + format(riktning,'s')
 			raise ValueError(err)
 	#end match case
-	h = 1 - (stats.norm.cdf(k2, x, s) - stats.norm.cdf(k1, x, s))
+	x,h = _styrkefkn_curve(k1, k2, s, x_lim[0], x_lim[1], n_points)
 	
 	#if mu_sant given compute power at that point
 	if not (mu_sant is None):
-		f = 1 - (stats.norm.cdf(k2, mu_sant, s) - stats.norm.cdf(k1, mu_sant, s))
+		f = 1 - (ndtr((k2-mu_sant)/s) - ndtr((k1-mu_sant)/s))
 	else:
 		f = None
 	#if not (mu_sant is None):
@@ -90,15 +134,7 @@ def styrkefkn(mu0, sigma, n, alpha=0.05, riktning='!=', mu_sant=None):
 	ax_h.set_xlim( (min(x),max(x)) )
 	ax_h.set_ylim( (-0.1, 1.1) )
 
-	#add text annotation - position
-	match riktning:
-		case "<":
-			x_text = max(x)-2*s
-		case ">":
-			x_text = min(x)+s
-		case _: #the != case
-			x_text = mu0-0.5*s
-	#and text, y-max is 1.1
+	#add text annotation (x_text set above), y-max is 1.1
 	y_text = 1
 	ax_h.text(x_text, 0.9*y_text, r'H$_0$: $\mu$ = ' + format(mu0,'4.1f'))
 	ax_h.text(x_text, 0.8*y_text, r'H$_1$: $\mu$ ' + riktning + ' ' + \
@@ -112,12 +148,15 @@ def styrkefkn(mu0, sigma, n, alpha=0.05, riktning='!=', mu_sant=None):
 		return fig
 	
 	#otehrwise do plots for H1 and H0 comparisson
-	#compute maximum of density function
-	f_0 = stats.norm.pdf(0,0,s)
+	#compute maximum of density function, 1/(s*sqrt(2*pi))
+	inv_s = 1.0/s
+	f_0 = inv_s / np.sqrt(2*np.pi)
 		
 	#compute density functions
-	y = stats.norm.pdf(x, mu0, s)
-	y_H1 = stats.norm.pdf(x, mu_sant, s)
+	z0 = (x-mu0)*inv_s
+	y = f_0 * np.exp(-0.5*z0*z0)
+	z1 = (x-mu_sant)*inv_s
+	y_H1 = f_0 * np.exp(-0.5*z1*z1)
 		
 	axs[1].plot(x, y_H1, color='b')
 	axs[1].plot(x, y, color='k')
@@ -125,11 +164,15 @@ def styrkefkn(mu0, sigma, n, alpha=0.05, riktning='!=', mu_sant=None):
 	axs[1].set_xlim( (min(x),max(x)) )
 	axs[1].set_ylim( (0, 1.2*f_0) )
 
+	#områden för att inte förkasta och förkasta H0
+	m_mid = (k1<x) & (x<k2)
+	m_lo = x<k1
+	m_hi = x>k2
 	#arean forkasta inte H0
-	axs[1].fill_between(x[(k1<x) & (x<k2)], y_H1[(k1<x) & (x<k2)], color='b')
+	axs[1].fill_between(x[m_mid], y_H1[m_mid], color='b')
 	#arean forkasta inte H1
-	axs[1].fill_between(x[x<k1], y[x<k1], color='r')
-	axs[1].fill_between(x[x>k2], y[x>k2], color='r')
+	axs[1].fill_between(x[m_lo], y[m_lo], color='r')
+	axs[1].fill_between(x[m_hi], y[m_hi], color='r')
 	
 	#final guide lines
 	axs[1].plot([mu0,mu0], [0,f_0], color='k', linestyle='--')